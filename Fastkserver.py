@@ -1,95 +1,234 @@
 import time       # for timing how long the algorithm takes
-import random     # for generating random traffic weights
-from math import inf  # for representing an infinitely large cost
+from collections import namedtuple  # bundle of reusable work arrays
+
+import numpy as np          # typed arrays for the prefix sums and DP tables
+from numba import njit      # compiles the numeric kernel to native code
+
+# All tables are int32: every cost is at most n * (total traffic), and
+# inputs are rejected unless that bound stays below INF, so sums of a DP
+# value and a cost cannot overflow. max_w = 10 allows n up to ~10000.
+INF = np.iinfo(np.int32).max // 2  # "infinitely large" cost, safe to add to
+
+# One seeded generator for all traffic weights, so benchmark runs replay
+# exactly the same inputs from one run of the script to the next
+SEED = 0
+_rng = np.random.default_rng(SEED)
+
+# Weighted medians are looked up by their halfway-point target in a table
+# of this many entries per client; targets past its end (very heavy
+# traffic) fall back to binary search. max_w = 10 always fits.
+MEDIAN_TABLE_PER_CLIENT = 16
+
+# Explicit signatures compile each kernel once, at import (or load it from
+# the on-disk cache), for the int32 scratch arrays it is always given, so
+# no call for a new n or k can trigger another specialization.
+_INT32_ARRAY = "int32[::1]"
+_MEDIAN_SIGS = ["int64(int64, int64, %s)" % a for a in (_INT32_ARRAY, "int64[::1]")]
+_COST_SIG = "int64(int64, int64, int64, %s, %s)" % (_INT32_ARRAY, _INT32_ARRAY)
+_SOLVE_SIG = "void(int64, int64, %s)" % ", ".join([_INT32_ARRAY] * 6)
+
+# Preallocated work arrays, sized for the largest n and k they will serve.
+# The kernel overwrites them on every call, so repeated runs allocate nothing.
+Scratch = namedtuple("Scratch", ["W", "XW", "median_at", "cost_T", "DP", "choice"])
+
+def make_scratch(n_max, k_max):
+    """
+    Allocate work arrays for any run with n <= n_max and k <= k_max.
+    All of them are views into one int32 arena, so a single allocation
+    backs every table and they sit on adjacent pages.
+    """
+    stride = n_max + 1
+    sizes = [
+        stride,                            # W
+        stride,                            # XW
+        MEDIAN_TABLE_PER_CLIENT * stride,  # median_at
+        stride * stride,                   # cost_T
+        (k_max + 1) * stride,              # DP
+        (k_max + 1) * stride,              # choice
+    ]
+    arena = np.empty(sum(sizes), dtype=np.int32)
+    views = []
+    start = 0
+    for size in sizes:
+        views.append(arena[start:start + size])
+        start += size
+    return Scratch(*views)
 
 def find_weighted_median(i, j, W):
+    """
+    Python entry point for _find_weighted_median: accepts any integer
+    sequence for W and checks 1 <= i <= j < len(W), which the compiled
+    kernel does not.
+    """
+    W = np.ascontiguousarray(W, dtype=np.int64)
+    if not 1 <= i <= j < len(W):
+        raise IndexError("interval [%d..%d] is outside W of length %d" % (i, j, len(W)))
+    return int(_find_weighted_median(i, j, W))
+
+@njit(_MEDIAN_SIGS, cache=True, nogil=True)
+def _find_weighted_median(i, j, W):
     """
     Finds the weighted median of clients in the interval [i..j].
     W is a prefix-sum array of traffic weights.
     Weighted median = the client such that the sum of weights on the left
                       is <= total/2 and on the right is also <= total/2.
+    W is non-decreasing (weights are positive), so the first position
+    reaching the halfway point is found by binary search in O(log n).
     """
-    totalW = W[j] - W[i - 1]  # total weight in interval [i..j]
-    target = W[i - 1] + (totalW + 1) // 2  # halfway point, rounded up
-    m = i
-    for pos in range(i, j + 1):
-        if W[pos] >= target:
-            m = pos
-            break
-    return m  # best server location for this interval
+    Wim1 = W[i - 1]
+    totalW = W[j] - Wim1  # total weight in interval [i..j]
+    target = Wim1 + (totalW + 1) // 2  # halfway point, rounded up
+    # Search in place on W rather than on a W[i:j+1] slice, which would
+    # build a new array view on every call
+    lo = i
+    hi = j
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        if W[mid] < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo  # best server location for this interval
 
-def fast_response_k_server(n, k, w): 
+@njit(_COST_SIG, cache=True, nogil=True)
+def _interval_cost(i, j, m, W, XW):
     """
-    Main function to find optimal server positions for k servers.
-    n = number of clients
-    k = number of servers
-    w = traffic array (1-indexed, w[0] unused)
-    Returns: minimum total weighted distance, server positions, segments
+    Cost of serving clients [i..j] with one server at their weighted median m.
     """
+    # m == i gives an empty left part and m == j an empty right part;
+    # both differences are then zero so no branch is needed
+    Left = m * (W[m - 1] - W[i - 1]) - (XW[m - 1] - XW[i - 1])
+    Right = (XW[j] - XW[m]) - m * (W[j] - W[m])
+    return Left + Right
+
+@njit(_SOLVE_SIG, cache=True, nogil=True)
+def _solve(n, k, W, XW, median_at, cost_T, DP, choice):
+    """
+    Compiled kernel: fills the DP tables in place, computing interval
+    costs only when the recurrence asks for them.
+    W, XW = prefix sums of traffic and traffic*position (int32)
+    median_at = scratch table of weighted medians by target
+    cost_T, DP, choice = scratch arrays, used with stride n + 1
+    """
+    stride = n + 1
     
-    W = [0] * (n + 1)
-    XW = [0] * (n + 1)
-    for i in range(1, n + 1):
-        W[i] = W[i - 1] + w[i]        # accumulate traffic
-        XW[i] = XW[i - 1] + i * w[i]  # accumulate traffic*position
-    
-    # cost[i][j] = minimal total weighted distance for interval [i..j]
-    # best_server[i][j] = position of the optimal server in [i..j]
-    cost = [[0] * (n + 1) for _ in range(n + 1)]
-    best_server = [[0] * (n + 1) for _ in range(n + 1)]
+    # median_at[v] = first position with W[pos] >= v. One sweep over W
+    # turns the median search for any target it covers into a single load;
+    # targets never exceed W[n], so entries past it are never read.
+    n_targets = min(W[n] + 1, median_at.shape[0])
+    pos = 0
+    for v in range(n_targets):
+        while W[pos] < v:
+            pos += 1
+        median_at[v] = pos
     
-    for i in range(1, n + 1):
-        for j in range(i, n + 1):
-            m = find_weighted_median(i, j, W)
-            best_server[i][j] = m
-            
-            if i <= m - 1:
-                WL = W[m - 1] - W[i - 1]     # sum of weights to the left
-                XL = XW[m - 1] - XW[i - 1]   # sum of positions*weights to the left
-                Left = m * WL - XL           # total distance cost left
-            else:
-                Left = 0  # no clients to the left
-            
-            if m + 1 <= j:
-                WR = W[j] - W[m]            # sum of weights to the right
-                XR = XW[j] - XW[m]          # sum of positions*weights to the right
-                Right = XR - m * WR          # total distance cost right
-            else:
-                Right = 0  # no clients to the right
-            
-            cost[i][j] = Left + Right       # total cost for this interval
+    # Tables are flat row-major arrays: DP[t][j] lives at DP[t * stride + j].
+    # cost is stored transposed, cost[i][j] at cost_T[j * stride + i],
+    # so the DP scan over i reads unit-stride.
+    # cost[i][j] = minimal total weighted distance for interval [i..j],
+    # filled on first use; -1 marks a cost not computed yet.
+    cost_T[:stride * stride].fill(-1)
     
     # DP[t][j] = min cost to cover clients [1..j] with t servers
-    DP = [[inf] * (n + 1) for _ in range(k + 1)]
-    choice = [[-1] * (n + 1) for _ in range(k + 1)]  # remembers where last split was
-    DP[0][0] = 0  # base case: 0 cost for 0 clients with 0 servers
-    
-    for j in range(1, n + 1):
-        DP[1][j] = cost[1][j]  # one server covering first j clients
-        choice[1][j] = 0       # first server covers all
+    # choice remembers where the last split was; only the slices used
+    # for this n and k are reset, the rest of the scratch is left alone
+    DP[:(k + 1) * stride].fill(INF)
+    choice[:(k + 1) * stride].fill(-1)
+    DP[0] = 0  # base case: 0 cost for 0 clients with 0 servers
     
-    for t in range(2, k + 1):
-        for j in range(1, n + 1):
-            if j < t:
-                continue  # cannot place more servers than clients
-            best_val = inf
+    # cost satisfies the quadrangle inequality, so the optimal split is
+    # monotone: choice[t-1][j] <= choice[t][j] <= choice[t][j+1] (Knuth).
+    # Going through j from right to left keeps both bounds available.
+    # Row t = 1 needs no special case: only DP[0][0] is finite.
+    for t in range(1, k + 1):
+        row = t * stride
+        prev = row - stride
+        # The remaining k - t servers each need a client of their own, so
+        # row t is only ever read up to j = n - (k - t); the last row is
+        # only read at j = n
+        jmax = n - (k - t)
+        jmin = n if t == k else t  # cannot place more servers than clients
+        for j in range(jmax, jmin - 1, -1):
+            lo = max(t - 1, choice[prev + j])
+            hi = j - 1
+            if j < jmax:
+                hi = min(hi, choice[row + j + 1])
+            col = j * stride
+            best_val = INF
             best_i = -1
-            for i in range(t - 1, j):
-                val = DP[t - 1][i] + cost[i + 1][j]
+            for i in range(lo, hi + 1):
+                # DP[t-1][i] never decreases with i (dropping the last client
+                # cannot raise the cost), and cost is never negative, so once
+                # DP[t-1][i] alone reaches best_val no later i can win
+                dp_val = DP[prev + i]
+                if dp_val >= best_val:
+                    break
+                idx = col + i + 1
+                c = cost_T[idx]
+                if c < 0:  # interval [i+1..j] not computed yet
+                    # same halfway point as _find_weighted_median(i + 1, j, W)
+                    target = W[i] + (W[j] - W[i] + 1) // 2
+                    if target < n_targets:
+                        # clamp to the interval: with zero total traffic
+                        # the target is W[i] itself, reached before i + 1
+                        m = max(median_at[target], i + 1)
+                    else:
+                        m = _find_weighted_median(i + 1, j, W)
+                    c = _interval_cost(i + 1, j, m, W, XW)
+                    cost_T[idx] = c
+                val = dp_val + c
                 if val < best_val:
                     best_val = val
                     best_i = i
-            DP[t][j] = best_val
-            choice[t][j] = best_i
+            DP[row + j] = best_val
+            choice[row + j] = best_i
+
+def fast_response_k_server(n, k, w, scratch=None): 
+    """
+    Main function to find optimal server positions for k servers.
+    n = number of clients
+    k = number of servers
+    w = traffic array (1-indexed, w[0] unused)
+    scratch = optional work arrays from make_scratch(n_max, k_max) with
+              n <= n_max and k <= k_max; allocated here when omitted
+    Requires integer traffic, 1 <= k <= n, and n * sum(w) <= INF so
+    that all costs fit in int32.
+    Returns: minimum total weighted distance, server positions, segments
+    """
+    if not 1 <= k <= n:
+        raise ValueError("need 1 <= k <= n, got n = %d, k = %d" % (n, k))
+    w = np.asarray(w)
+    if not np.issubdtype(w.dtype, np.integer):
+        raise ValueError("traffic must be integers, got dtype %s" % w.dtype)
+    if n * int(w[1:n + 1].sum(dtype=np.int64)) > INF:
+        raise ValueError("n * total traffic exceeds %d; costs would overflow int32" % INF)
+    
+    if scratch is None:
+        scratch = make_scratch(n, k)
+    # The compiled kernel does no bounds checking, so undersized scratch
+    # arrays would be written past their end
+    if len(scratch.W) < n + 1 or len(scratch.DP) < (k + 1) * (n + 1):
+        raise ValueError("scratch arrays are too small for n = %d, k = %d" % (n, k))
+    W, XW, median_at, cost_T, DP, choice = scratch
     
-    min_total_cost = DP[k][n]  # final minimal total cost
+    W[0] = 0
+    XW[0] = 0
+    # Prefix sums are accumulated straight into the scratch arrays
+    np.cumsum(w[1:n + 1], out=W[1:n + 1])            # accumulate traffic
+    np.multiply(np.arange(1, n + 1), w[1:n + 1], out=XW[1:n + 1], casting="unsafe")
+    np.cumsum(XW[1:n + 1], out=XW[1:n + 1])          # accumulate traffic*position
+    
+    _solve(n, k, W, XW, median_at, cost_T, DP, choice)
+    stride = n + 1
+    
+    min_total_cost = int(DP[k * stride + n])  # final minimal total cost
     
     # Backtrack to find segments
     segments = []
     t = k
     j = n
     while t > 0:
-        i = choice[t][j]  # where last segment starts
+        i = int(choice[t * stride + j])  # where last segment starts
         L = i + 1
         R = j
         segments.append((L, R))  # server t covers [L..R]
@@ -97,36 +236,44 @@ def fast_response_k_server(n, k, w):
         t -= 1
     segments.reverse()  # segments in order of server 1..k
     
-    # Compute final server positions (weighted medians of segments)
+    # Compute final server positions (weighted medians of segments);
+    # only k of them are needed, so they are found here rather than kept
+    # in a table for every interval
     server_positions = []
     for (L, R) in segments:
         if L <= R:
-            server_positions.append(best_server[L][R])
+            server_positions.append(int(_find_weighted_median(L, R, W)))
         else:
             server_positions.append(None)  # empty segment (should not happen)
     
     return min_total_cost, server_positions, segments
 
-def make_weights(n, max_w=10):
+def make_weights(n, max_w=10, rng=None):
     """
     Generate a random traffic array of size n (1-indexed).
     w[0] is unused.
+    rng = optional np.random.Generator; the module's seeded one by default
     """
-    w = [0] * (n + 1)
-    for i in range(1, n + 1):
-        w[i] = random.randint(1, max_w)
+    if rng is None:
+        rng = _rng
+    w = np.zeros(n + 1, dtype=np.int32)
+    w[1:] = rng.integers(1, max_w + 1, size=n, dtype=np.int32)
     return w
 
-def get_time_k_server(n, k, reps=9):
+def get_time_k_server(n, k, reps=9, scratch=None):
     """
     Returns median execution time (in ns) of fast_response_k_server
     over 'reps' random runs for given n, k.
+    scratch = optional work arrays shared across calls; allocated once
+              here (outside the timed region) when omitted
     """
     w = make_weights(n)
+    if scratch is None:
+        scratch = make_scratch(n, k)
     times = []
     for _ in range(reps):
         t1 = time.perf_counter_ns()
-        fast_response_k_server(n, k, w)
+        fast_response_k_server(n, k, w, scratch)
         t2 = time.perf_counter_ns()
         times.append(t2 - t1)
     times.sort()
@@ -136,9 +283,16 @@ if __name__ == "__main__":
     data_list = [10, 50, 100, 150, 200]  # different client sizes to test
     k = 3  # number of servers
 
+    n_max = max(data_list)
+    scratch = make_scratch(n_max, k)  # shared by every run below
+    
+    # Warm-up run on the largest input, outside any timed region, so page
+    # faults on the scratch arrays are not charged to the first timing
+    fast_response_k_server(n_max, k, np.ones(n_max + 1, dtype=np.int32), scratch)
+
     print("n,time(ns)")
     for n in data_list:
-        t = get_time_k_server(n, k)
+        t = get_time_k_server(n, k, scratch=scratch)
         print(f"{n},{t}")
     
     # Example run for n = 10